@@ -0,0 +1,88 @@
+"""Time the crud.py workload against one or more databases.
+
+Each URL must point at a scratch database: it is migrated to head, filled
+with sections, tasks and subtasks, and emptied again.
+
+    python benchmarks/crud.py sqlite:////tmp/taskalert-bench.db postgresql://.../taskalert_bench
+"""
+import argparse
+import statistics
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.engine import make_url
+
+from taskalert.backend import crud, database, schemas
+
+def migrate(database_url: str) -> None:
+    config = Config()
+    config.set_main_option("script_location", str(database.ALEMBIC_SCRIPT_LOCATION))
+    config.attributes["database_url"] = database_url
+    command.upgrade(config, "head")
+
+def run_workload(database_url: str, sections: int, tasks_per_section: int, subtasks_per_task: int) -> dict:
+    migrate(database_url)
+    engine = database.init_engine(database_url)
+    timings = defaultdict(list)
+
+    def timed(name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        result = fn(*args, **kwargs)
+        timings[name].append(time.perf_counter() - start)
+        return result
+
+    db = database.SessionLocal()
+    try:
+        reminder = datetime.now() + timedelta(hours=1)
+        section_ids = []
+        for s in range(sections):
+            db_section = timed("create_section", crud.create_section, db, schemas.SectionCreate(name=f"bench-{s}"))
+            section_ids.append(db_section.id)
+            for t in range(tasks_per_section):
+                db_task = timed("create_task", crud.create_task, db, schemas.TaskCreate(
+                    summary=f"task {t}", reminder_time=reminder, section_id=db_section.id
+                ))
+                for k in range(subtasks_per_task):
+                    timed("create_subtask", crud.create_subtask, db, schemas.SubtaskCreate(step=f"step {k}"), db_task.id)
+                timed("get_task", crud.get_task, db, db_task.id)
+                timed("update_task_full", crud.update_task_full, db, db_task.id, schemas.FullTaskUpdate(
+                    summary=f"task {t}", reminder_time=reminder, is_completed=True
+                ))
+        for section_id in section_ids:
+            timed("get_tasks_by_section", crud.get_tasks_by_section, db, section_id)
+        for _ in range(sections):
+            # Mirrors GET /sections/: the whole tree is serialized per request.
+            timed("get_sections (tree)", lambda: [
+                schemas.Section.model_validate(section, from_attributes=True)
+                for section in crud.get_sections(db)
+            ])
+            db.expire_all()
+        for section_id in section_ids:
+            timed("delete_section", crud.delete_section, db, section_id)
+    finally:
+        db.close()
+        engine.dispose()
+    return timings
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("database_urls", nargs="+")
+    parser.add_argument("--sections", type=int, default=10)
+    parser.add_argument("--tasks-per-section", type=int, default=50)
+    parser.add_argument("--subtasks-per-task", type=int, default=3)
+    args = parser.parse_args()
+
+    for database_url in args.database_urls:
+        timings = run_workload(database_url, args.sections, args.tasks_per_section, args.subtasks_per_task)
+        print(f"\n{make_url(database_url).get_backend_name()}: {database_url}")
+        print(f"{'operation':<22} {'calls':>6} {'median ms':>10} {'p95 ms':>10}")
+        for name, samples in timings.items():
+            samples_ms = sorted(sample * 1000 for sample in samples)
+            p95 = samples_ms[int(len(samples_ms) * 0.95) - 1] if len(samples_ms) > 1 else samples_ms[0]
+            print(f"{name:<22} {len(samples_ms):>6} {statistics.median(samples_ms):>10.3f} {p95:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Measure notification pipeline throughput.
+
+Fills a scratch database with due reminders and times how long the
+pipeline takes to deliver them all to sinks that simulate network latency.
+
+    python benchmarks/notifications.py sqlite:////tmp/taskalert-notify.db --tasks 5000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+
+from taskalert.backend import database, models, notifications
+
+from crud import migrate
+
+class SimulatedSink(notifications.NotificationSink):
+    def __init__(self, name: str, latency: float, max_concurrency: int):
+        self.name = name
+        self.latency = latency
+        self.max_concurrency = max_concurrency
+
+    async def send(self, notification) -> None:
+        await asyncio.sleep(self.latency)
+
+def seed(tasks: int) -> None:
+    db = database.SessionLocal()
+    try:
+        section = models.Section(name=f"notify-bench-{time.time_ns()}")
+        db.add(section)
+        db.commit()
+        due = datetime.now() - timedelta(minutes=1)
+        db.execute(insert(models.Task), [
+            {"summary": f"task {i}", "reminder_time": due, "is_completed": False, "section_id": section.id}
+            for i in range(tasks)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+def delivered_count() -> int:
+    db = database.SessionLocal()
+    try:
+        return db.execute(
+            select(func.count()).where(models.Notification.status == notifications.DELIVERED)
+        ).scalar_one()
+    finally:
+        db.close()
+
+async def run(args) -> None:
+    sinks = [
+        notifications.BrowserAlertSink(),
+        SimulatedSink("webhook", latency=args.latency, max_concurrency=50),
+        SimulatedSink("smtp", latency=args.latency * 5, max_concurrency=10),
+    ]
+    pipeline = notifications.NotificationPipeline(database.SessionLocal, sinks, poll_interval=0.1)
+    expected = delivered_count() + args.tasks * len(sinks)
+    start = time.perf_counter()
+    await pipeline.start()
+    while delivered_count() < expected:
+        await asyncio.sleep(0.2)
+    elapsed = time.perf_counter() - start
+    await pipeline.stop()
+
+    print(f"{args.tasks * len(sinks)} deliveries in {elapsed:.2f} s "
+          f"({args.tasks * len(sinks) / elapsed * 60:.0f} per minute)")
+    for name, metrics in pipeline.metrics.items():
+        snapshot = metrics.snapshot()
+        print(f"{name:<10} delivered {snapshot.delivered:>6}   p50 {snapshot.latency_p50_ms:8.2f} ms   "
+              f"p95 {snapshot.latency_p95_ms:8.2f} ms")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("database_url")
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.02, help="simulated webhook latency in seconds")
+    args = parser.parse_args()
+
+    migrate(args.database_url)
+    database.init_engine(args.database_url)
+    seed(args.tasks)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
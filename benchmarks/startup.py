@@ -0,0 +1,57 @@
+"""Measure how long a backend worker takes to become ready.
+
+Cold import runs in a fresh interpreter each time, as a new worker or
+container would. Lifespan startup covers engine creation and the Alembic
+revision check against the database given by --database-url.
+
+    python benchmarks/startup.py --database-url postgresql://...
+"""
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); "
+    "import taskalert.backend.main; "
+    "print(time.perf_counter() - start)"
+)
+
+def time_cold_import() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], check=True, capture_output=True, text=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+async def time_lifespan(database_url: str, check_schema: bool) -> float:
+    from taskalert.backend.main import create_app
+
+    app = create_app(database_url=database_url, check_schema=check_schema)
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        elapsed = time.perf_counter() - start
+    return elapsed
+
+def report(label: str, samples: list) -> None:
+    samples_ms = [sample * 1000 for sample in samples]
+    print(f"{label:<28} median {statistics.median(samples_ms):8.2f} ms   max {max(samples_ms):8.2f} ms")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="database to start against; skips lifespan timing if omitted")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--no-schema-check", action="store_true")
+    args = parser.parse_args()
+
+    report("cold import", [time_cold_import() for _ in range(args.runs)])
+    if args.database_url:
+        samples = [
+            asyncio.run(time_lifespan(args.database_url, check_schema=not args.no_schema_check))
+            for _ in range(args.runs)
+        ]
+        report("lifespan startup", samples)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
+import os
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from taskalert.backend.database import Base
+from taskalert.backend import models  # noqa: F401  registers the tables on Base.metadata
+from taskalert.backend.database import DATABASE_URL_ENV, Base
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -15,6 +17,12 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# A URL passed programmatically through config.attributes wins over the
+# environment, which in turn wins over the ini file.
+database_url = config.attributes.get("database_url") or os.environ.get(DATABASE_URL_ENV)
+if database_url:
+    config.set_main_option("sqlalchemy.url", database_url)
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -45,6 +53,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
     )
 
     with context.begin_transaction():
@@ -65,8 +74,11 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # SQLite cannot ALTER constraints; batch mode rebuilds the table instead.
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
@@ -19,12 +19,51 @@ depends_on: Union[str, Sequence[str], None] = None
 
 
 def upgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # Databases created by the old import-time create_all() already have these
+    # tables and should be stamped at this revision instead of upgraded.
+    op.create_table(
+        'sections',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_sections_id'), 'sections', ['id'], unique=False)
+    op.create_index(op.f('ix_sections_name'), 'sections', ['name'], unique=True)
+
+    op.create_table(
+        'tasks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('summary', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('reminder_time', sa.DateTime(), nullable=True),
+        sa.Column('is_completed', sa.Boolean(), nullable=True),
+        sa.Column('section_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['section_id'], ['sections.id'], name='tasks_section_id_fkey'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_tasks_id'), 'tasks', ['id'], unique=False)
+    op.create_index(op.f('ix_tasks_summary'), 'tasks', ['summary'], unique=False)
+    op.create_index(op.f('ix_tasks_reminder_time'), 'tasks', ['reminder_time'], unique=False)
+
+    op.create_table(
+        'subtasks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('step', sa.String(), nullable=True),
+        sa.Column('is_completed', sa.Boolean(), nullable=True),
+        sa.Column('task_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], name='subtasks_task_id_fkey'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_subtasks_id'), 'subtasks', ['id'], unique=False)
 
 
 def downgrade() -> None:
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_index(op.f('ix_subtasks_id'), table_name='subtasks')
+    op.drop_table('subtasks')
+    op.drop_index(op.f('ix_tasks_reminder_time'), table_name='tasks')
+    op.drop_index(op.f('ix_tasks_summary'), table_name='tasks')
+    op.drop_index(op.f('ix_tasks_id'), table_name='tasks')
+    op.drop_table('tasks')
+    op.drop_index(op.f('ix_sections_name'), table_name='sections')
+    op.drop_index(op.f('ix_sections_id'), table_name='sections')
+    op.drop_table('sections')
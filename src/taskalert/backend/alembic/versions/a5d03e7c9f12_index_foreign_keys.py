@@ -0,0 +1,30 @@
+"""Index foreign key columns of tasks and subtasks
+
+Revision ID: a5d03e7c9f12
+Revises: f2c8d6a41b97
+Create Date: 2026-10-21 09:37:18.220641
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5d03e7c9f12'
+down_revision: Union[str, None] = 'f2c8d6a41b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ON DELETE CASCADE looks children up by these columns; unindexed, every
+    # deleted parent scans the whole child table.
+    op.create_index(op.f('ix_tasks_section_id'), 'tasks', ['section_id'], unique=False)
+    op.create_index(op.f('ix_subtasks_task_id'), 'subtasks', ['task_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_subtasks_task_id'), table_name='subtasks')
+    op.drop_index(op.f('ix_tasks_section_id'), table_name='tasks')
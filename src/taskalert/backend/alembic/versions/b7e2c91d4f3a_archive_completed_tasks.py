@@ -0,0 +1,62 @@
+"""Archive completed tasks
+
+Revision ID: b7e2c91d4f3a
+Revises: 4adad9ceb1e6
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c91d4f3a'
+down_revision: Union[str, None] = '4adad9ceb1e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('tasks', sa.Column('completed_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_tasks_completed_at'), 'tasks', ['completed_at'], unique=False)
+    # Tasks completed before this column existed start their archive clock now.
+    op.execute("UPDATE tasks SET completed_at = CURRENT_TIMESTAMP WHERE is_completed")
+
+    op.create_table(
+        'archived_tasks',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('summary', sa.String(), nullable=True),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('reminder_time', sa.DateTime(), nullable=True),
+        sa.Column('is_completed', sa.Boolean(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.Column('section_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['section_id'], ['sections.id'], name='archived_tasks_section_id_fkey'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_archived_tasks_archived_at'), 'archived_tasks', ['archived_at'], unique=False)
+    op.create_index(op.f('ix_archived_tasks_section_id'), 'archived_tasks', ['section_id'], unique=False)
+
+    op.create_table(
+        'archived_subtasks',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('step', sa.String(), nullable=True),
+        sa.Column('is_completed', sa.Boolean(), nullable=True),
+        sa.Column('task_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['task_id'], ['archived_tasks.id'], name='archived_subtasks_task_id_fkey'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_archived_subtasks_task_id'), 'archived_subtasks', ['task_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_archived_subtasks_task_id'), table_name='archived_subtasks')
+    op.drop_table('archived_subtasks')
+    op.drop_index(op.f('ix_archived_tasks_section_id'), table_name='archived_tasks')
+    op.drop_index(op.f('ix_archived_tasks_archived_at'), table_name='archived_tasks')
+    op.drop_table('archived_tasks')
+    op.drop_index(op.f('ix_tasks_completed_at'), table_name='tasks')
+    op.drop_column('tasks', 'completed_at')
@@ -0,0 +1,37 @@
+"""Per-sink notification enqueue state
+
+Revision ID: c61e9b2f8a04
+Revises: a5d03e7c9f12
+Create Date: 2026-10-21 11:02:45.731904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c61e9b2f8a04'
+down_revision: Union[str, None] = 'a5d03e7c9f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notification_sink_state',
+        sa.Column('sink', sa.String(), nullable=False),
+        sa.Column('enqueued_until', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('sink'),
+    )
+    # Sinks that already have outbox rows resume from their latest reminder
+    # instead of falling back to the first-deploy backfill window.
+    op.execute(
+        "INSERT INTO notification_sink_state (sink, enqueued_until) "
+        "SELECT sink, MAX(reminder_time) FROM notifications GROUP BY sink"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('notification_sink_state')
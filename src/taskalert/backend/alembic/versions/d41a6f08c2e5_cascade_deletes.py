@@ -0,0 +1,41 @@
+"""Cascade deletes
+
+Revision ID: d41a6f08c2e5
+Revises: b7e2c91d4f3a
+Create Date: 2026-10-19 10:03:55.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41a6f08c2e5'
+down_revision: Union[str, None] = 'b7e2c91d4f3a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, constraint, column, referred table)
+FOREIGN_KEYS = [
+    ('tasks', 'tasks_section_id_fkey', 'section_id', 'sections'),
+    ('subtasks', 'subtasks_task_id_fkey', 'task_id', 'tasks'),
+    ('archived_tasks', 'archived_tasks_section_id_fkey', 'section_id', 'sections'),
+    ('archived_subtasks', 'archived_subtasks_task_id_fkey', 'task_id', 'archived_tasks'),
+]
+
+
+def _recreate_foreign_keys(ondelete: Union[str, None]) -> None:
+    for table, constraint, column, referred_table in FOREIGN_KEYS:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(constraint, type_='foreignkey')
+            batch_op.create_foreign_key(constraint, referred_table, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _recreate_foreign_keys(ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    _recreate_foreign_keys(ondelete=None)
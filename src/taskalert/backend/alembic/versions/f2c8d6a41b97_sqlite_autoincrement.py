@@ -0,0 +1,47 @@
+"""SQLite autoincrement for tasks and subtasks
+
+Revision ID: f2c8d6a41b97
+Revises: e93b5a17d820
+Create Date: 2026-10-20 10:14:32.905177
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8d6a41b97'
+down_revision: Union[str, None] = 'e93b5a17d820'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (hot table, archive table holding ids that must not be reissued)
+TABLES = [('tasks', 'archived_tasks'), ('subtasks', 'archived_subtasks')]
+
+
+def _rebuild(autoincrement: bool) -> None:
+    for table, _ in TABLES:
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}):
+            pass
+
+
+def upgrade() -> None:
+    # Postgres sequences never reuse ids; only SQLite needs AUTOINCREMENT.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild(autoincrement=True)
+    for table, archive_table in TABLES:
+        op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{table}'")
+        op.execute(
+            f"INSERT INTO sqlite_sequence (name, seq) SELECT '{table}', MAX("
+            f"COALESCE((SELECT MAX(id) FROM {table}), 0), "
+            f"COALESCE((SELECT MAX(id) FROM {archive_table}), 0))"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild(autoincrement=False)
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional
+
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from taskalert.backend import models
+
+ARCHIVE_AFTER_DAYS = 30
+ARCHIVE_BATCH_SIZE = 500
+# Batch ids are bound as one parameter each; stay under SQLite's historical
+# limit of 999 variables per statement.
+ARCHIVE_MAX_BATCH_SIZE = 900
+ARCHIVE_INTERVAL_ENV = "TASKALERT_ARCHIVE_INTERVAL_SECONDS"
+ARCHIVE_INTERVAL_SECONDS = 3600.0
+
+logger = logging.getLogger(__name__)
+
+class RestoreConflictError(Exception):
+    """An archived task, or one of its subtasks, shares an id with a live row."""
+
+def archive_completed_tasks_batch(db: Session, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> List[int]:
+    """Move one batch of tasks completed before `cutoff`, with their subtasks, into the archive tables."""
+    archivable = (models.Task.is_completed.is_(True), models.Task.completed_at < cutoff)
+    task_ids = db.execute(
+        select(models.Task.id)
+        .where(*archivable)
+        .order_by(models.Task.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    if not task_ids:
+        return []
+
+    # SQLite ignores FOR UPDATE, so a task may have been reopened since it was
+    # selected; every statement below re-checks that it is still archivable.
+    batch = (models.Task.id.in_(task_ids), *archivable)
+    archived_at = datetime.now()
+    db.execute(
+        insert(models.ArchivedTask).from_select(
+            ["id", "summary", "description", "reminder_time", "is_completed", "completed_at", "archived_at", "section_id"],
+            select(
+                models.Task.id,
+                models.Task.summary,
+                models.Task.description,
+                models.Task.reminder_time,
+                models.Task.is_completed,
+                models.Task.completed_at,
+                literal(archived_at),
+                models.Task.section_id,
+            ).where(*batch),
+        )
+    )
+    db.execute(
+        insert(models.ArchivedSubtask).from_select(
+            ["id", "step", "is_completed", "task_id"],
+            select(
+                models.Subtask.id,
+                models.Subtask.step,
+                models.Subtask.is_completed,
+                models.Subtask.task_id,
+            ).join(models.Task, models.Subtask.task_id == models.Task.id).where(*batch),
+        )
+    )
+    # Subtasks go with their tasks through ON DELETE CASCADE.
+    archived_ids = db.execute(delete(models.Task).where(*batch).returning(models.Task.id)).scalars().all()
+    db.commit()
+    return list(archived_ids)
+
+def archive_completed_tasks(
+    session_factory: Callable[[], Session],
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> int:
+    """Archive every task completed more than `older_than_days` ago.
+
+    Each batch runs in its own session and transaction so locks stay short
+    and an interrupted run keeps the batches it already committed.
+    """
+    if not 1 <= batch_size <= ARCHIVE_MAX_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {ARCHIVE_MAX_BATCH_SIZE}")
+    cutoff = datetime.now() - timedelta(days=older_than_days)
+    archived = 0
+    while True:
+        db = session_factory()
+        try:
+            task_ids = archive_completed_tasks_batch(db, cutoff=cutoff, batch_size=batch_size)
+        finally:
+            db.close()
+        archived += len(task_ids)
+        if not task_ids or len(task_ids) < batch_size:
+            return archived
+
+def get_archive_interval() -> Optional[float]:
+    """Seconds between periodic archive runs; None when disabled with a value of 0."""
+    interval = float(os.environ.get(ARCHIVE_INTERVAL_ENV, ARCHIVE_INTERVAL_SECONDS))
+    return interval if interval > 0 else None
+
+async def run_periodic_archive(
+    session_factory: Callable[[], Session],
+    interval: float,
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> None:
+    """Archive old completed tasks every `interval` seconds, off the event loop."""
+    while True:
+        try:
+            archived = await asyncio.to_thread(
+                archive_completed_tasks, session_factory, older_than_days=older_than_days, batch_size=batch_size
+            )
+            if archived:
+                logger.info("Archived %d completed tasks", archived)
+        except Exception:
+            logger.exception("Periodic archive run failed")
+        await asyncio.sleep(interval)
+
+def restore_task(db: Session, task_id: int):
+    """Move an archived task and its subtasks back into the hot tables.
+
+    Raises RestoreConflictError if its id has been reused in the hot tables.
+    """
+    db_archived = db.query(models.ArchivedTask).filter(models.ArchivedTask.id == task_id).first()
+    if db_archived is None:
+        return None
+
+    # Restart the archive clock so the task is not swept straight back.
+    completed_at = datetime.now() if db_archived.is_completed else None
+    try:
+        _move_archived_task(db, db_archived, completed_at)
+    except IntegrityError as e:
+        db.rollback()
+        raise RestoreConflictError(f"Task {task_id} conflicts with an existing task or subtask") from e
+    return db.query(models.Task).filter(models.Task.id == task_id).first()
+
+def _move_archived_task(db: Session, db_archived: models.ArchivedTask, completed_at: Optional[datetime]) -> None:
+    task_id = db_archived.id
+    db.execute(
+        insert(models.Task).values(
+            id=db_archived.id,
+            summary=db_archived.summary,
+            description=db_archived.description,
+            reminder_time=db_archived.reminder_time,
+            is_completed=db_archived.is_completed,
+            completed_at=completed_at,
+            section_id=db_archived.section_id,
+        )
+    )
+    db.execute(
+        insert(models.Subtask).from_select(
+            ["id", "step", "is_completed", "task_id"],
+            select(
+                models.ArchivedSubtask.id,
+                models.ArchivedSubtask.step,
+                models.ArchivedSubtask.is_completed,
+                models.ArchivedSubtask.task_id,
+            ).where(models.ArchivedSubtask.task_id == task_id),
+        )
+    )
+    db.execute(delete(models.ArchivedTask).where(models.ArchivedTask.id == task_id))
+    db.commit()
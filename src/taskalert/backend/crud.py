@@ -1,4 +1,7 @@
-from sqlalchemy.orm import Session
+from datetime import datetime
+
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Query, Session
 from sqlalchemy.sql import text
 
 from taskalert.backend import models, schemas
@@ -30,22 +33,35 @@ def update_section(db: Session, section_id: int, section_update: schemas.Section
     return db_section
 
 def delete_section(db: Session, section_id: int):
-    db_section = get_section(db, section_id=section_id)
-    if db_section:
-        db.delete(db_section)
-        db.commit()
-        return True
-    return False
+    result = db.execute(delete(models.Section).where(models.Section.id == section_id))
+    db.commit()
+    return result.rowcount > 0
 
 # Task CRUD
-def get_task(db: Session, task_id: int):
-    return db.query(models.Task).filter(models.Task.id == task_id).first()
+def _paginate_with_archived(hot_query: Query, archived_query: Query, skip: int, limit: int):
+    # Archived rows are paged as if appended after the hot rows.
+    hot = hot_query.offset(skip).limit(limit).all()
+    if len(hot) >= limit:
+        return hot
+    hot_count = skip + len(hot) if hot else hot_query.count()
+    archived = archived_query.offset(max(0, skip - hot_count)).limit(limit - len(hot)).all()
+    return hot + archived
+
+def get_task(db: Session, task_id: int, include_archived: bool = False):
+    db_task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    if db_task is None and include_archived:
+        db_task = db.query(models.ArchivedTask).filter(models.ArchivedTask.id == task_id).first()
+    return db_task
 
-def get_tasks(db: Session, skip: int = 0, limit: int = 100):
+def get_tasks(db: Session, skip: int = 0, limit: int = 100, include_archived: bool = False):
+    if include_archived:
+        return _paginate_with_archived(db.query(models.Task), db.query(models.ArchivedTask), skip, limit)
     return db.query(models.Task).offset(skip).limit(limit).all()
 
 def create_task(db: Session, task: schemas.TaskCreate):
     db_task = models.Task(**task.model_dump())
+    if db_task.is_completed:
+        db_task.completed_at = datetime.now()
     db.add(db_task)
     db.commit()
     db.refresh(db_task)
@@ -55,24 +71,62 @@ def create_task(db: Session, task: schemas.TaskCreate):
 def update_task_full(db: Session, task_id: int, task_update_full: schemas.FullTaskUpdate):
     db_task = get_task(db, task_id=task_id)
     if db_task:
+        was_completed = db_task.is_completed
         for key, value in task_update_full.model_dump(exclude_unset=True).items():
             setattr(db_task, key, value)
+        if db_task.is_completed and not was_completed:
+            db_task.completed_at = datetime.now()
+        elif not db_task.is_completed:
+            db_task.completed_at = None
         db.commit()
         db.refresh(db_task)
     return db_task
 
 
 def delete_task(db: Session, task_id: int):
-    db_task = get_task(db, task_id=task_id)
-    if db_task:
-        db.delete(db_task)
-        db.commit()
-        return True
-    return False
-
-def get_tasks_by_section(db: Session, section_id: int, skip: int = 0, limit: int = 100):
+    result = db.execute(delete(models.Task).where(models.Task.id == task_id))
+    db.commit()
+    return result.rowcount > 0
+
+def get_tasks_by_section(db: Session, section_id: int, skip: int = 0, limit: int = 100, include_archived: bool = False):
+    if include_archived:
+        return _paginate_with_archived(
+            db.query(models.Task).filter(models.Task.section_id == section_id),
+            db.query(models.ArchivedTask).filter(models.ArchivedTask.section_id == section_id),
+            skip,
+            limit,
+        )
     return db.query(models.Task).filter(models.Task.section_id == section_id).offset(skip).limit(limit).all()
 
+def _task_filter_clauses(task_filter: schemas.TaskFilter):
+    # Bulk actions only ever target tasks that are still open.
+    clauses = [models.Task.is_completed.is_not(True)]
+    if task_filter.section_id is not None:
+        clauses.append(models.Task.section_id == task_filter.section_id)
+    if task_filter.overdue_before is not None:
+        clauses.append(models.Task.reminder_time < task_filter.overdue_before)
+    if task_filter.task_ids is not None:
+        clauses.append(models.Task.id.in_(task_filter.task_ids))
+    return clauses
+
+def _bulk_update_tasks(db: Session, task_filter: schemas.TaskFilter, **values):
+    result = db.execute(
+        update(models.Task)
+        .where(*_task_filter_clauses(task_filter))
+        .values(**values)
+        .returning(models.Task.id)
+        .execution_options(synchronize_session=False)
+    )
+    task_ids = result.scalars().all()
+    db.commit()
+    return task_ids
+
+def snooze_tasks(db: Session, action: schemas.TaskSnoozeAction):
+    return _bulk_update_tasks(db, action, reminder_time=action.reminder_time)
+
+def complete_tasks(db: Session, action: schemas.TaskCompleteAction):
+    return _bulk_update_tasks(db, action, is_completed=True, completed_at=datetime.now())
+
 # Subtask CRUD
 def create_subtask(db: Session, subtask: schemas.SubtaskCreate, task_id: int):
     db_subtask = models.Subtask(**subtask.model_dump(), task_id=task_id)
@@ -87,7 +141,7 @@ def get_subtasks_by_task(db: Session, task_id: int, skip: int = 0, limit: int =
 def get_subtask(db: Session, subtask_id: int):
     return db.query(models.Subtask).filter(models.Subtask.id == subtask_id).first()
 
-def update_subtask_full(db: Session, subtask_id: int, subtask_update_full: schemas.SubtaskCompletionUpdate): # Use SubtaskUpdate schema
+def update_subtask_full(db: Session, subtask_id: int, subtask_update_full: schemas.FullSubtaskUpdate):
     db_subtask = get_subtask(db, subtask_id=subtask_id)
     if db_subtask:
         for key, value in subtask_update_full.model_dump(exclude_unset=True).items():
@@ -97,9 +151,6 @@ def update_subtask_full(db: Session, subtask_id: int, subtask_update_full: schem
     return db_subtask
 
 def delete_subtask(db: Session, subtask_id: int):
-    db_subtask = get_subtask(db, subtask_id=subtask_id)
-    if db_subtask:
-        db.delete(db_subtask)
-        db.commit()
-        return True
-    return False
\ No newline at end of file
+    result = db.execute(delete(models.Subtask).where(models.Subtask.id == subtask_id))
+    db.commit()
+    return result.rowcount > 0
\ No newline at end of file
@@ -1,14 +1,14 @@
-from typing import List
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Sequence
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, FastAPI, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
-from taskalert.backend import crud, models, schemas
-from taskalert.backend.database import SessionLocal, engine
+from taskalert.backend import archive, crud, database, notifications, schemas
+from taskalert.backend.database import SessionLocal
 
-models.Base.metadata.create_all(bind=engine)
-
-app = FastAPI()
+router = APIRouter()
 
 # Dependency
 def get_db():
@@ -19,33 +19,33 @@ def get_db():
         db.close()
 
 # Sections Endpoints
-@app.post("/sections/", response_model=schemas.Section, tags=["sections"])
+@router.post("/sections/", response_model=schemas.Section, tags=["sections"])
 def create_section_api(section: schemas.SectionCreate, db: Session = Depends(get_db)):
     db_section = crud.get_section_by_name(db, name=section.name)
     if db_section:
         raise HTTPException(status_code=400, detail="Section name already registered")
     return crud.create_section(db=db, section=section)
 
-@app.get("/sections/", response_model=List[schemas.Section], tags=["sections"])
+@router.get("/sections/", response_model=List[schemas.Section], tags=["sections"])
 def read_sections_api(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     sections = crud.get_sections(db, skip=skip, limit=limit)
     return sections
 
-@app.get("/sections/{section_id}", response_model=schemas.SectionWithTasks, tags=["sections"])
+@router.get("/sections/{section_id}", response_model=schemas.SectionWithTasks, tags=["sections"])
 def read_section_api(section_id: int, db: Session = Depends(get_db)):
     db_section = crud.get_section(db, section_id=section_id)
     if db_section is None:
         raise HTTPException(status_code=404, detail="Section not found")
     return db_section
 
-@app.put("/sections/{section_id}", response_model=schemas.Section, tags=["sections"])
+@router.put("/sections/{section_id}", response_model=schemas.Section, tags=["sections"])
 def update_section_api(section_id: int, section_update: schemas.SectionUpdate, db: Session = Depends(get_db)):
     db_section = crud.update_section(db, section_id=section_id, section_update=section_update)
     if db_section is None:
         raise HTTPException(status_code=404, detail="Section not found")
     return db_section
 
-@app.delete("/sections/{section_id}", tags=["sections"])
+@router.delete("/sections/{section_id}", tags=["sections"])
 def delete_section_api(section_id: int, db: Session = Depends(get_db)):
     if crud.delete_section(db, section_id=section_id):
         return {"ok": True}
@@ -53,52 +53,88 @@ def delete_section_api(section_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Section not found")
 
 # Tasks Endpoints
-@app.post("/tasks/", response_model=schemas.Task, tags=["tasks"])
+@router.post("/tasks/", response_model=schemas.Task, tags=["tasks"])
 def create_task_api(task: schemas.TaskCreate, db: Session = Depends(get_db)):
     return crud.create_task(db=db, task=task)
 
-@app.get("/tasks/", response_model=List[schemas.Task], tags=["tasks"])
-def read_tasks_api(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    tasks = crud.get_tasks(db, skip=skip, limit=limit)
+@router.get("/tasks/", response_model=List[schemas.Task], tags=["tasks"])
+def read_tasks_api(skip: int = 0, limit: int = 100, include_archived: bool = False, db: Session = Depends(get_db)):
+    tasks = crud.get_tasks(db, skip=skip, limit=limit, include_archived=include_archived)
     return tasks
 
-@app.get("/tasks/{task_id}", response_model=schemas.Task, tags=["tasks"])
-def read_task_api(task_id: int, db: Session = Depends(get_db)):
-    db_task = crud.get_task(db, task_id=task_id)
+def _require_task_filter(task_filter: schemas.TaskFilter):
+    if task_filter.section_id is None and task_filter.overdue_before is None and task_filter.task_ids is None:
+        raise HTTPException(status_code=400, detail="At least one of section_id, overdue_before or task_ids is required")
+
+@router.post("/tasks/actions/snooze", response_model=schemas.TaskActionResult, tags=["tasks"])
+def snooze_tasks_api(action: schemas.TaskSnoozeAction, db: Session = Depends(get_db)):
+    _require_task_filter(action)
+    return {"task_ids": crud.snooze_tasks(db, action=action)}
+
+@router.post("/tasks/actions/complete", response_model=schemas.TaskActionResult, tags=["tasks"])
+def complete_tasks_api(action: schemas.TaskCompleteAction, db: Session = Depends(get_db)):
+    _require_task_filter(action)
+    return {"task_ids": crud.complete_tasks(db, action=action)}
+
+@router.get("/tasks/{task_id}", response_model=schemas.Task, tags=["tasks"])
+def read_task_api(task_id: int, include_archived: bool = False, db: Session = Depends(get_db)):
+    db_task = crud.get_task(db, task_id=task_id, include_archived=include_archived)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return db_task
 
-@app.put("/tasks/{task_id}", response_model=schemas.Task, tags=["tasks"])
+@router.put("/tasks/{task_id}", response_model=schemas.Task, tags=["tasks"])
 def update_task_api(task_id: int, task_update: schemas.FullTaskUpdate, db: Session = Depends(get_db)):
     db_task = crud.update_task_full(db, task_id=task_id, task_update_full=task_update)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return db_task
 
-@app.delete("/tasks/{task_id}", tags=["tasks"])
+@router.delete("/tasks/{task_id}", tags=["tasks"])
 def delete_task_api(task_id: int, db: Session = Depends(get_db)):
     if crud.delete_task(db, task_id=task_id):
         return {"ok": True}
     else:
         raise HTTPException(status_code=404, detail="Task not found")
 
-@app.get("/sections/{section_id}/tasks", response_model=List[schemas.Task], tags=["tasks"])
-def read_tasks_by_section_api(section_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    tasks = crud.get_tasks_by_section(db, section_id=section_id, skip=skip, limit=limit)
+@router.get("/sections/{section_id}/tasks", response_model=List[schemas.Task], tags=["tasks"])
+def read_tasks_by_section_api(section_id: int, skip: int = 0, limit: int = 100, include_archived: bool = False, db: Session = Depends(get_db)):
+    tasks = crud.get_tasks_by_section(db, section_id=section_id, skip=skip, limit=limit, include_archived=include_archived)
     return tasks
 
+@router.post("/tasks/{task_id}/restore", response_model=schemas.Task, tags=["tasks"])
+def restore_task_api(task_id: int, db: Session = Depends(get_db)):
+    try:
+        db_task = archive.restore_task(db, task_id=task_id)
+    except archive.RestoreConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Archived task not found")
+    return db_task
+
+# Archive Endpoints
+@router.post("/archive/run", tags=["archive"])
+def run_archive_api(
+    background_tasks: BackgroundTasks,
+    older_than_days: int = Query(archive.ARCHIVE_AFTER_DAYS, ge=0),
+    batch_size: int = Query(archive.ARCHIVE_BATCH_SIZE, ge=1, le=archive.ARCHIVE_MAX_BATCH_SIZE),
+):
+    background_tasks.add_task(
+        archive.archive_completed_tasks, SessionLocal, older_than_days=older_than_days, batch_size=batch_size
+    )
+    return {"ok": True}
+
 # Subtasks Endpoints
-@app.post("/tasks/{task_id}/subtasks/", response_model=schemas.Subtask, tags=["subtasks"])
+@router.post("/tasks/{task_id}/subtasks/", response_model=schemas.Subtask, tags=["subtasks"])
 def create_subtask_api(task_id: int, subtask: schemas.SubtaskCreate, db: Session = Depends(get_db)):
     return crud.create_subtask(db=db, subtask=subtask, task_id=task_id)
 
-@app.get("/tasks/{task_id}/subtasks/", response_model=List[schemas.Subtask], tags=["subtasks"])
+@router.get("/tasks/{task_id}/subtasks/", response_model=List[schemas.Subtask], tags=["subtasks"])
 def read_subtasks_by_task_api(task_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     subtasks = crud.get_subtasks_by_task(db, task_id=task_id, skip=skip, limit=limit)
     return subtasks
 
-@app.put("/subtasks/{subtask_id}", response_model=schemas.Subtask, tags=["subtasks"])
+@router.put("/subtasks/{subtask_id}", response_model=schemas.Subtask, tags=["subtasks"])
 def update_subtask_api(subtask_id: int, subtask_update: schemas.FullSubtaskUpdate, db: Session = Depends(get_db)):
     print(f"Received subtask_update for id {subtask_id}: {subtask_update}") # Added logging here
     db_subtask = crud.update_subtask_full(db, subtask_id=subtask_id, subtask_update_full=subtask_update)
@@ -106,9 +142,63 @@ def update_subtask_api(subtask_id: int, subtask_update: schemas.FullSubtaskUpdat
         raise HTTPException(status_code=404, detail="Subtask not found")
     return db_subtask
 
-@app.delete("/subtasks/{subtask_id}", tags=["subtasks"])
+@router.delete("/subtasks/{subtask_id}", tags=["subtasks"])
 def delete_subtask_api(subtask_id: int, db: Session = Depends(get_db)):
     if crud.delete_subtask(db, subtask_id=subtask_id):
         return {"ok": True}
     else:
-        raise HTTPException(status_code=404, detail="Subtask not found")
\ No newline at end of file
+        raise HTTPException(status_code=404, detail="Subtask not found")
+
+# Notifications Endpoints
+@router.get("/notifications/browser", response_model=List[schemas.Notification], tags=["notifications"])
+def read_browser_alerts_api(after_id: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return notifications.get_browser_alerts(db, after_id=after_id, limit=limit)
+
+@router.get("/notifications/metrics", response_model=Dict[str, schemas.SinkMetrics], tags=["notifications"])
+def read_notification_metrics_api(request: Request):
+    pipeline = request.app.state.notifications
+    if pipeline is None:
+        return {}
+    return {name: metrics.snapshot() for name, metrics in pipeline.metrics.items()}
+
+def create_app(
+    database_url: Optional[str] = None,
+    check_schema: bool = True,
+    notification_sinks: Optional[Sequence[notifications.NotificationSink]] = None,
+    enable_notifications: bool = True,
+    archive_interval: Optional[float] = None,
+) -> FastAPI:
+    """Build the API. The engine is created, and the schema checked, only when the app starts.
+
+    Sinks default to those configured through the environment, as does the
+    archive interval (seconds; 0 disables the periodic archive job).
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        engine = database.init_engine(database_url)
+        if check_schema:
+            database.check_schema_revision(engine)
+        app.state.engine = engine
+        app.state.notifications = None
+        if enable_notifications:
+            sinks = notification_sinks if notification_sinks is not None else notifications.sinks_from_env()
+            app.state.notifications = notifications.NotificationPipeline(
+                SessionLocal, sinks, backfill=notifications.backfill_from_env()
+            )
+            await app.state.notifications.start()
+        interval = archive.get_archive_interval() if archive_interval is None else (archive_interval or None)
+        archive_job = asyncio.create_task(archive.run_periodic_archive(SessionLocal, interval)) if interval else None
+        yield
+        if archive_job is not None:
+            archive_job.cancel()
+            await asyncio.gather(archive_job, return_exceptions=True)
+        if app.state.notifications is not None:
+            await app.state.notifications.stop()
+        engine.dispose()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(router)
+    return app
+
+app = create_app()
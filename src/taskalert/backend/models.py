@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from taskalert.backend.database import Base
@@ -9,27 +9,90 @@ class Section(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
 
-    tasks = relationship("Task", back_populates="section")
+    tasks = relationship("Task", back_populates="section", cascade="all, delete-orphan", passive_deletes=True)
 
 class Task(Base):
     __tablename__ = "tasks"
+    # Archived tasks keep their ids, so SQLite must never hand them out again.
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     summary = Column(String, index=True)
     description = Column(String, nullable=True)
     reminder_time = Column(DateTime, index=True)
     is_completed = Column(Boolean, default=False)
-    section_id = Column(Integer, ForeignKey("sections.id"))
+    completed_at = Column(DateTime, nullable=True, index=True)
+    section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), index=True)
 
     section = relationship("Section", back_populates="tasks")
-    subtasks = relationship("Subtask", back_populates="task")
+    subtasks = relationship("Subtask", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+
+    is_archived = False
 
 class Subtask(Base):
     __tablename__ = "subtasks"
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     step = Column(String)
     is_completed = Column(Boolean, default=False)
-    task_id = Column(Integer, ForeignKey("tasks.id"))
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), index=True)
+
+    task = relationship("Task", back_populates="subtasks")
+
+# Cold storage for tasks completed long ago. Rows keep their original ids so
+# they can be moved back into the hot tables unchanged.
+class ArchivedTask(Base):
+    __tablename__ = "archived_tasks"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    summary = Column(String)
+    description = Column(String, nullable=True)
+    reminder_time = Column(DateTime)
+    is_completed = Column(Boolean, default=True)
+    completed_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, index=True)
+    section_id = Column(Integer, ForeignKey("sections.id", ondelete="CASCADE"), index=True)
+
+    subtasks = relationship("ArchivedSubtask", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+
+    is_archived = True
+
+class ArchivedSubtask(Base):
+    __tablename__ = "archived_subtasks"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    step = Column(String)
+    is_completed = Column(Boolean, default=False)
+    task_id = Column(Integer, ForeignKey("archived_tasks.id", ondelete="CASCADE"), index=True)
+
+    task = relationship("ArchivedTask", back_populates="subtasks")
+
+# Outbox for reminder notifications: one row per task, sink and reminder time.
+# A row is written before delivery is attempted, so a crash never loses one.
+class Notification(Base):
+    __tablename__ = "notifications"
+    __table_args__ = (
+        UniqueConstraint("task_id", "sink", "reminder_time", name="uq_notifications_task_sink_reminder"),
+        Index("ix_notifications_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), index=True)
+    sink = Column(String)
+    summary = Column(String, nullable=True)
+    reminder_time = Column(DateTime)
+    status = Column(String, default="pending")
+    attempts = Column(Integer, default=0)
+    next_attempt_at = Column(DateTime)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime)
+    delivered_at = Column(DateTime, nullable=True)
+
+# Enqueue high-water mark per sink, so a restart resumes where the last run
+# stopped instead of from a window around process start.
+class NotificationSinkState(Base):
+    __tablename__ = "notification_sink_state"
 
-    task = relationship("Task", back_populates="subtasks")
\ No newline at end of file
+    sink = Column(String, primary_key=True)
+    enqueued_until = Column(DateTime)
@@ -0,0 +1,459 @@
+"""Reminder notification pipeline.
+
+Due reminders are written to the `notifications` outbox, one row per task
+and sink. A poller claims due rows under a lease and feeds them through a
+bounded asyncio queue to workers, which deliver each batch concurrently and
+record the outcome in one transaction. Failed deliveries are retried with
+exponential backoff. Rows whose lease runs out, e.g. after a crash, are
+claimed again.
+"""
+import asyncio
+import logging
+import os
+import smtplib
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import exists, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from taskalert.backend import models, schemas
+
+PENDING = "pending"
+DELIVERED = "delivered"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+logger = logging.getLogger(__name__)
+
+# Sinks
+
+class NotificationSink:
+    """Delivers notifications to one destination. `send` raises to request a retry."""
+
+    name = "sink"
+    max_concurrency = 10
+
+    async def send(self, notification: schemas.Notification) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+class BrowserAlertSink(NotificationSink):
+    """The in-browser audio alert.
+
+    Delivering only marks the outbox row as delivered. The Streamlit app
+    polls delivered rows through `GET /notifications/browser`, so alerts
+    raised while no tab is open are shown when one connects.
+    """
+
+    name = "browser"
+    max_concurrency = 100
+
+    async def send(self, notification: schemas.Notification) -> None:
+        pass
+
+class WebhookSink(NotificationSink):
+    name = "webhook"
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        self.url = url
+        self.timeout = timeout
+        self._client = None
+
+    async def send(self, notification: schemas.Notification) -> None:
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        response = await self._client.post(self.url, content=notification.model_dump_json(),
+                                           headers={"Content-Type": "application/json"})
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+class SmtpSink(NotificationSink):
+    """Sends one email per notification.
+
+    For local testing, point it at a stand-in server such as
+    `python -m aiosmtpd -n -l localhost:8025`.
+    """
+
+    name = "smtp"
+    max_concurrency = 5
+
+    def __init__(self, host: str, port: int, sender: str, recipients: Sequence[str],
+                 username: Optional[str] = None, password: Optional[str] = None, starttls: bool = False,
+                 timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = list(recipients)
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def _send_sync(self, notification: schemas.Notification) -> None:
+        message = EmailMessage()
+        message["Subject"] = f"Reminder: {notification.summary}"
+        message["From"] = self.sender
+        message["To"] = ", ".join(self.recipients)
+        message.set_content(f"{notification.summary}\n\nDue at {notification.reminder_time:%Y-%m-%d %H:%M}.")
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(message)
+
+    async def send(self, notification: schemas.Notification) -> None:
+        await asyncio.to_thread(self._send_sync, notification)
+
+def backfill_from_env() -> Optional[timedelta]:
+    """TASKALERT_NOTIFICATION_BACKFILL_MINUTES; a negative value sends every overdue reminder."""
+    minutes = float(os.environ.get("TASKALERT_NOTIFICATION_BACKFILL_MINUTES", "60"))
+    return timedelta(minutes=minutes) if minutes >= 0 else None
+
+def sinks_from_env() -> List[NotificationSink]:
+    sinks: List[NotificationSink] = [BrowserAlertSink()]
+    if os.environ.get("TASKALERT_WEBHOOK_URL"):
+        sinks.append(WebhookSink(os.environ["TASKALERT_WEBHOOK_URL"]))
+    if os.environ.get("TASKALERT_SMTP_HOST"):
+        sinks.append(SmtpSink(
+            host=os.environ["TASKALERT_SMTP_HOST"],
+            port=int(os.environ.get("TASKALERT_SMTP_PORT", "25")),
+            sender=os.environ.get("TASKALERT_SMTP_SENDER", "taskalert@localhost"),
+            recipients=[r.strip() for r in os.environ.get("TASKALERT_SMTP_RECIPIENTS", "").split(",") if r.strip()],
+            username=os.environ.get("TASKALERT_SMTP_USERNAME"),
+            password=os.environ.get("TASKALERT_SMTP_PASSWORD"),
+            starttls=os.environ.get("TASKALERT_SMTP_STARTTLS") == "1",
+        ))
+    return sinks
+
+# Outbox
+
+def enqueue_due_notifications(db: Session, sink_names: Sequence[str], now: datetime,
+                              backfill: Optional[timedelta] = None) -> None:
+    """Write an outbox row per sink for every open task whose reminder is due.
+
+    Each sink resumes from the time it was last enqueued up to, kept in
+    `notification_sink_state`; a sink without history starts from `now`.
+    Reminders due more than `backfill` before that point are skipped, so
+    an outage of any length is caught up while a first deploy or a newly
+    enabled sink is not flooded with every stale overdue task.
+    """
+    enqueued_until = dict(db.execute(
+        select(models.NotificationSinkState.sink, models.NotificationSinkState.enqueued_until)
+        .where(models.NotificationSinkState.sink.in_(sink_names))
+    ).all())
+    for sink in sink_names:
+        window = []
+        if backfill is not None:
+            window = [models.Task.reminder_time >= (enqueued_until.get(sink) or now) - backfill]
+        already_queued = exists().where(
+            models.Notification.task_id == models.Task.id,
+            models.Notification.sink == sink,
+            models.Notification.reminder_time == models.Task.reminder_time,
+        )
+        db.execute(
+            insert(models.Notification).from_select(
+                ["task_id", "sink", "summary", "reminder_time", "status", "attempts", "next_attempt_at", "created_at"],
+                select(
+                    models.Task.id,
+                    literal(sink),
+                    models.Task.summary,
+                    models.Task.reminder_time,
+                    literal(PENDING),
+                    literal(0),
+                    literal(now),
+                    literal(now),
+                ).where(
+                    models.Task.is_completed.is_not(True),
+                    models.Task.reminder_time <= now,
+                    *window,
+                    ~already_queued,
+                ),
+            )
+        )
+        if sink in enqueued_until:
+            db.execute(
+                update(models.NotificationSinkState)
+                .where(models.NotificationSinkState.sink == sink)
+                .values(enqueued_until=now)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            db.execute(insert(models.NotificationSinkState).values(sink=sink, enqueued_until=now))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker queued the same reminders first.
+        db.rollback()
+
+def claim_due_notifications(db: Session, sink_names: Sequence[str], now: datetime, limit: int,
+                            lease: timedelta, max_attempts: int) -> List[schemas.Notification]:
+    """Lease up to `limit` due notifications to this process.
+
+    Claiming counts as an attempt, so rows whose lease ran out because a
+    delivery or its bookkeeping crashed still reach `max_attempts`.
+    """
+    # Drop reminders that were completed or snoozed before they went out.
+    still_due = exists().where(
+        models.Task.id == models.Notification.task_id,
+        models.Task.is_completed.is_not(True),
+        models.Task.reminder_time == models.Notification.reminder_time,
+    )
+    db.execute(
+        update(models.Notification)
+        .where(models.Notification.status == PENDING, ~still_due)
+        .values(status=CANCELLED)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(models.Notification)
+        .where(
+            models.Notification.status == PENDING,
+            models.Notification.next_attempt_at <= now,
+            models.Notification.attempts >= max_attempts,
+        )
+        .values(status=FAILED, last_error="Gave up after the lease of the last attempt expired")
+        .execution_options(synchronize_session=False)
+    )
+    notification_ids = db.execute(
+        select(models.Notification.id)
+        .where(
+            models.Notification.status == PENDING,
+            models.Notification.sink.in_(sink_names),
+            models.Notification.next_attempt_at <= now,
+        )
+        .order_by(models.Notification.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    claimed = []
+    if notification_ids:
+        rows = db.scalars(
+            update(models.Notification)
+            .where(models.Notification.id.in_(notification_ids))
+            .values(next_attempt_at=now + lease, attempts=models.Notification.attempts + 1)
+            .returning(models.Notification)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = [schemas.Notification.model_validate(row, from_attributes=True) for row in rows]
+    db.commit()
+    return claimed
+
+def record_delivery_results(db: Session, delivered_ids: Sequence[int], failures: Sequence[dict], now: datetime) -> None:
+    """Mark delivered rows and apply the retry schedule computed for failed ones."""
+    if delivered_ids:
+        db.execute(
+            update(models.Notification)
+            .where(models.Notification.id.in_(delivered_ids))
+            .values(status=DELIVERED, delivered_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    for failure in failures:
+        db.execute(
+            update(models.Notification)
+            .where(models.Notification.id == failure["id"])
+            .values(**{key: value for key, value in failure.items() if key != "id"})
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+def get_browser_alerts(db: Session, after_id: int = 0, limit: int = 100):
+    """Delivered browser alerts whose task is still open and not snoozed past them, newest first.
+
+    Alerts for overdue open tasks stay in this set, so newest-first keeps
+    fresh alerts inside `limit` however many old ones are still active.
+    """
+    return (
+        db.query(models.Notification)
+        .join(models.Task, models.Task.id == models.Notification.task_id)
+        .filter(
+            models.Task.is_completed.is_not(True),
+            models.Task.reminder_time == models.Notification.reminder_time,
+            models.Notification.sink == BrowserAlertSink.name,
+            models.Notification.status == DELIVERED,
+            models.Notification.id > after_id,
+        )
+        .order_by(models.Notification.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+# Pipeline
+
+class SinkMetrics:
+    def __init__(self, latency_samples: int = 1000):
+        self.delivered = 0
+        self.failed_attempts = 0
+        self.abandoned = 0
+        self._latencies = deque(maxlen=latency_samples)
+        self._delivered_at = deque()
+
+    def _trim_window(self, now: float) -> None:
+        window_start = now - 60
+        while self._delivered_at and self._delivered_at[0] < window_start:
+            self._delivered_at.popleft()
+
+    def record_success(self, latency: float) -> None:
+        now = time.monotonic()
+        self.delivered += 1
+        self._latencies.append(latency)
+        self._delivered_at.append(now)
+        # Trim here too, so the window stays bounded when nobody reads metrics.
+        self._trim_window(now)
+
+    def record_failure(self, abandoned: bool) -> None:
+        self.failed_attempts += 1
+        if abandoned:
+            self.abandoned += 1
+
+    def snapshot(self) -> schemas.SinkMetrics:
+        self._trim_window(time.monotonic())
+        latencies_ms = sorted(latency * 1000 for latency in self._latencies)
+        percentile = lambda q: latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * q))]
+        return schemas.SinkMetrics(
+            delivered=self.delivered,
+            failed_attempts=self.failed_attempts,
+            abandoned=self.abandoned,
+            delivered_last_minute=len(self._delivered_at),
+            latency_p50_ms=percentile(0.5) if latencies_ms else None,
+            latency_p95_ms=percentile(0.95) if latencies_ms else None,
+            latency_max_ms=latencies_ms[-1] if latencies_ms else None,
+        )
+
+class NotificationPipeline:
+    """Moves due reminders from the outbox to the sinks without blocking the API.
+
+    Database work runs in worker threads; delivery runs on the event loop.
+    Keep `lease` longer than it takes to drain a full queue, or rows still
+    waiting in it are claimed a second time.
+
+    Each sink resumes enqueueing where it last stopped, even across
+    restarts, and also picks up reminders moved up to `backfill` into the
+    past. A sink with no history only gets reminders due within `backfill`
+    of now, so a first deploy or a newly enabled sink is not flooded with
+    every stale overdue task. Pass `backfill=None` to send all of them.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], sinks: Sequence[NotificationSink],
+                 queue_size: int = 1000, batch_size: int = 100, workers: int = 4, poll_interval: float = 1.0,
+                 send_timeout: float = 10.0, max_attempts: int = 5, backoff_base: float = 2.0,
+                 backoff_max: float = 300.0, lease: timedelta = timedelta(minutes=5),
+                 backfill: Optional[timedelta] = timedelta(hours=1)):
+        self.session_factory = session_factory
+        self.sinks: Dict[str, NotificationSink] = {sink.name: sink for sink in sinks}
+        self.metrics: Dict[str, SinkMetrics] = {name: SinkMetrics() for name in self.sinks}
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.send_timeout = send_timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease = lease
+        self.backfill = backfill
+        self._queue: Optional[asyncio.Queue] = None
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._limits = {name: asyncio.Semaphore(sink.max_concurrency) for name, sink in self.sinks.items()}
+        self._tasks = [asyncio.create_task(self._poll())]
+        self._tasks += [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for sink in self.sinks.values():
+            await sink.close()
+
+    def backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1)))
+
+    def _claim(self, limit: int) -> List[schemas.Notification]:
+        db = self.session_factory()
+        try:
+            now = datetime.now()
+            enqueue_due_notifications(db, list(self.sinks), now, backfill=self.backfill)
+            return claim_due_notifications(db, list(self.sinks), now, limit=limit, lease=self.lease,
+                                           max_attempts=self.max_attempts)
+        finally:
+            db.close()
+
+    def _record(self, delivered_ids: List[int], failures: List[dict]) -> None:
+        db = self.session_factory()
+        try:
+            record_delivery_results(db, delivered_ids, failures, now=datetime.now())
+        finally:
+            db.close()
+
+    async def _poll(self) -> None:
+        while True:
+            claimed = []
+            free = self.queue_size - self._queue.qsize()
+            if free > 0:
+                try:
+                    claimed = await asyncio.to_thread(self._claim, min(free, self.batch_size))
+                except Exception:
+                    logger.exception("Notification poll failed")
+            for notification in claimed:
+                await self._queue.put(notification)
+            if len(claimed) < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _work(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                results = await asyncio.gather(*(self._deliver(notification) for notification in batch))
+                delivered_ids = [notification.id for notification, error in results if error is None]
+                failures = [self._schedule_retry(notification, error) for notification, error in results if error]
+                await asyncio.to_thread(self._record, delivered_ids, failures)
+            except Exception:
+                # The leases expire and the batch is claimed again.
+                logger.exception("Recording notification batch of %d failed", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _deliver(self, notification: schemas.Notification):
+        sink = self.sinks[notification.sink]
+        async with self._limits[notification.sink]:
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(sink.send(notification), timeout=self.send_timeout)
+            except Exception as e:
+                logger.warning("Delivery of notification %d to %s failed: %r", notification.id, notification.sink, e)
+                return notification, repr(e)
+        self.metrics[notification.sink].record_success(time.perf_counter() - start)
+        return notification, None
+
+    def _schedule_retry(self, notification: schemas.Notification, error: str) -> dict:
+        # The claim already counted this attempt.
+        attempts = notification.attempts
+        abandoned = attempts >= self.max_attempts
+        self.metrics[notification.sink].record_failure(abandoned=abandoned)
+        failure = {"id": notification.id, "last_error": error[:500]}
+        if abandoned:
+            failure["status"] = FAILED
+        else:
+            failure["next_attempt_at"] = datetime.now() + self.backoff(attempts)
+        return failure
@@ -36,11 +36,27 @@ class FullTaskUpdate(TaskBase):
 class Task(TaskBase):
     id: int
     section_id: int
+    completed_at: Optional[datetime] = None
+    is_archived: bool = False
     subtasks: List[Subtask] = []
 
     class Config:
         orm_mode = True
 
+class TaskFilter(BaseModel):
+    section_id: Optional[int] = None
+    overdue_before: Optional[datetime] = None
+    task_ids: Optional[List[int]] = None
+
+class TaskSnoozeAction(TaskFilter):
+    reminder_time: datetime
+
+class TaskCompleteAction(TaskFilter):
+    pass
+
+class TaskActionResult(BaseModel):
+    task_ids: List[int]
+
 class SectionBase(BaseModel):
     name: str
 
@@ -58,4 +74,24 @@ class Section(SectionBase):
         orm_mode = True
 
 class SectionWithTasks(Section):
-    tasks: List[Task]
\ No newline at end of file
+    tasks: List[Task]
+
+class Notification(BaseModel):
+    id: int
+    task_id: int
+    sink: str
+    summary: Optional[str] = None
+    reminder_time: datetime
+    attempts: int = 0
+
+    class Config:
+        orm_mode = True
+
+class SinkMetrics(BaseModel):
+    delivered: int
+    failed_attempts: int
+    abandoned: int
+    delivered_last_minute: int
+    latency_p50_ms: Optional[float] = None
+    latency_p95_ms: Optional[float] = None
+    latency_max_ms: Optional[float] = None
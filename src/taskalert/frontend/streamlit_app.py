@@ -2,10 +2,13 @@ import streamlit as st
 from streamlit_date_picker import date_picker, PickerType
 from taskalert.backend import schemas
 import requests
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta
+from pathlib import Path
 from pydantic import ValidationError
 
 API_REFRESH_COUNT_STATE = "api_refresh_count"
+LAST_ALERT_ID_STATE = "last_alert_id"
+ALARM_FILE = Path(__file__).parent / "alarm.wav"
 API_BASE = "http://localhost:8123"
 
 
@@ -117,7 +120,11 @@ def display_task(task:schemas.Task) -> None:
             if st.button("Edit Task", key=f"edit_task_{task.id}"):
                 edit_task(task=task)
             if st.button("Delete Task", key=f"delete_task_{task.id}"):
-                pass
+                response = requests.delete("/".join([API_BASE, "tasks", str(task.id)]))
+                if response.ok:
+                    request_data_refresh()
+                    st.rerun()
+                st.write(response)
         with middle_col:
             display_subtaks(subtasks=task.subtasks, task_id=task.id)
 
@@ -130,7 +137,12 @@ def display_section(section: schemas.Section) -> None:
         left_col, right_col = st.columns(2)
         with right_col:
             if st.button(label="Delete Section", key=f"delete_section_{section.id}"):
-                st.write("delete")
+                # Tasks and subtasks are removed by the database cascade.
+                response = requests.delete("/".join([API_BASE, "sections", str(section.id)]))
+                if response.ok:
+                    request_data_refresh()
+                    st.rerun()
+                st.write(response)
         with left_col:
             if st.button(label="Create Task", key=f"create_task_{section.id}"):
                 create_task(section)
@@ -139,6 +151,50 @@ def display_section(section: schemas.Section) -> None:
 if not API_REFRESH_COUNT_STATE in st.session_state:
     st.session_state[API_REFRESH_COUNT_STATE] = 0
 
+if not LAST_ALERT_ID_STATE in st.session_state:
+    st.session_state[LAST_ALERT_ID_STATE] = 0
+
+@st.fragment(run_every="10s")
+def display_alerts() -> None:
+    # Alerts come from the backend outbox, so ones raised while no tab was open still show up here.
+    response = requests.get("/".join([API_BASE, "notifications", "browser"]))
+    if not response.ok:
+        return
+    alerts = [schemas.Notification.model_validate(alert) for alert in response.json()]
+    for alert in alerts:
+        st.warning(f"Reminder! {alert.summary} ({alert.reminder_time:%Y-%m-%d %H:%M})")
+    newest_id = max((alert.id for alert in alerts), default=0)
+    if newest_id > st.session_state[LAST_ALERT_ID_STATE]:
+        st.session_state[LAST_ALERT_ID_STATE] = newest_id
+        st.audio(str(ALARM_FILE), autoplay=True)
+    if alerts:
+        display_bulk_actions()
+
+def display_bulk_actions() -> None:
+    # Each button is one set-based UPDATE over every overdue open task.
+    snooze_col, complete_col = st.columns(2)
+    with snooze_col:
+        snooze_minutes = st.number_input("Snooze (minutes)", min_value=1, value=5, step=1, key="bulk_snooze_minutes")
+        if st.button("Snooze all overdue", key="bulk_snooze"):
+            now = datetime.now()
+            payload = schemas.TaskSnoozeAction(overdue_before=now, reminder_time=now + timedelta(minutes=snooze_minutes))
+            response = requests.post("/".join([API_BASE, "tasks", "actions", "snooze"]), json=payload.model_dump(mode="json"))
+            show_bulk_action_result(response, "snoozed")
+    with complete_col:
+        if st.button("Complete all overdue", key="bulk_complete"):
+            payload = schemas.TaskCompleteAction(overdue_before=datetime.now())
+            response = requests.post("/".join([API_BASE, "tasks", "actions", "complete"]), json=payload.model_dump(mode="json"))
+            show_bulk_action_result(response, "completed")
+
+def show_bulk_action_result(response: requests.Response, verb: str) -> None:
+    if not response.ok:
+        st.write(response)
+        return
+    result = schemas.TaskActionResult.model_validate(response.json())
+    st.success(f"{len(result.task_ids)} tasks {verb}")
+    request_data_refresh()
+    st.rerun()
+
 @st.fragment()
 def display_ui()->None:
     if st.button("Refresh"):
@@ -156,4 +212,6 @@ st.title("Task Alert")
 
 st.divider()
 
+display_alerts()
+
 display_ui()
\ No newline at end of file